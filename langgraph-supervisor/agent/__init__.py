@@ -3,6 +3,7 @@ Agent Layer
 LangChain v1 single agent and tools
 """
 from agent.single_agent import SingleAgent, get_agent, initialize_agent
+from agent.checkpointer import open_checkpointer, aopen_checkpointer
 from agent.tools import (
     fetch_account_details,
     fetch_facility_details,
@@ -15,6 +16,8 @@ __all__ = [
     'SingleAgent',
     'get_agent',
     'initialize_agent',
+    'open_checkpointer',
+    'aopen_checkpointer',
     'fetch_account_details',
     'fetch_facility_details',
     'save_note',
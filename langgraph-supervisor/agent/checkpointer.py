@@ -0,0 +1,89 @@
+"""
+Checkpointer
+Factories for the conversation checkpointer used by the agent graph
+Set CHECKPOINT_DSN (PostgreSQL) or CHECKPOINT_DB (SQLite file) to persist
+conversation state; with neither set the agent keeps state in memory
+"""
+import os
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+logger = logging.getLogger(__name__)
+
+
+def _checkpoint_dsn() -> Optional[str]:
+    """Get the configured PostgreSQL connection string, if any"""
+    return os.getenv("CHECKPOINT_DSN") or None
+
+
+def _checkpoint_db() -> Optional[str]:
+    """Get the configured SQLite checkpoint path, if any"""
+    return os.getenv("CHECKPOINT_DB") or None
+
+
+@contextmanager
+def open_checkpointer() -> Iterator[Optional[BaseCheckpointSaver]]:
+    """
+    Open the checkpointer for synchronous callers (CLI, scripts)
+    
+    Yields:
+        PostgresSaver when CHECKPOINT_DSN is set, SqliteSaver when CHECKPOINT_DB
+        is set, otherwise None so the agent falls back to its in-memory checkpointer
+    """
+    dsn = _checkpoint_dsn()
+    if dsn:
+        from langgraph.checkpoint.postgres import PostgresSaver
+        
+        logger.info("Using PostgreSQL checkpointer")
+        with PostgresSaver.from_conn_string(dsn) as checkpointer:
+            # Creates the checkpoint tables on first run
+            checkpointer.setup()
+            yield checkpointer
+        return
+    
+    db_path = _checkpoint_db()
+    if db_path:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        
+        logger.info("Using SQLite checkpointer: %s", db_path)
+        with SqliteSaver.from_conn_string(db_path) as checkpointer:
+            yield checkpointer
+        return
+    
+    yield None
+
+
+@asynccontextmanager
+async def aopen_checkpointer() -> AsyncIterator[Optional[BaseCheckpointSaver]]:
+    """
+    Open the checkpointer for async callers (API server)
+    
+    Yields:
+        AsyncPostgresSaver when CHECKPOINT_DSN is set, AsyncSqliteSaver when
+        CHECKPOINT_DB is set, otherwise None so the agent falls back to its
+        in-memory checkpointer
+    """
+    dsn = _checkpoint_dsn()
+    if dsn:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        
+        logger.info("Using async PostgreSQL checkpointer")
+        async with AsyncPostgresSaver.from_conn_string(dsn) as checkpointer:
+            # Creates the checkpoint tables on first run
+            await checkpointer.setup()
+            yield checkpointer
+        return
+    
+    db_path = _checkpoint_db()
+    if db_path:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        
+        logger.info("Using async SQLite checkpointer: %s", db_path)
+        async with AsyncSqliteSaver.from_conn_string(db_path) as checkpointer:
+            yield checkpointer
+        return
+    
+    yield None
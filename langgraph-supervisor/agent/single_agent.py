@@ -4,51 +4,27 @@ Main agent using LangGraph for state management and tool orchestration
 Uses structured output and agentic decision-making
 """
 import os
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from types import MappingProxyType
+from typing import AsyncIterator, Final, List, Dict, Any, Mapping, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import InMemorySaver
 
 from agent.tools import ALL_TOOLS
 from api.response_models import AgentOutput
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-class SingleAgent:
-    """
-    Single Agent that manages conversation and tool usage
-    Uses LangGraph for state management
-    """
-    
-    def __init__(self, api_key: Optional[str] = None, model_name: str = "gpt-4o-mini"):
-        """
-        Initialize the single agent with structured output
-        
-        Args:
-            api_key: OpenAI API key (defaults to env variable)
-            model_name: OpenAI model to use (defaults to gpt-4o-mini)
-        """
-        try:
-            logger.info(f"Initializing SingleAgent with model: {model_name}")
-            
-            # Set API key
-            if api_key:
-                os.environ["OPENAI_API_KEY"] = api_key
-            elif "OPENAI_API_KEY" not in os.environ:
-                raise ValueError("OPENAI_API_KEY must be provided or set in environment")
-            
-            # Initialize OpenAI model - structured output will be handled by create_agent via response_format
-            self.model = ChatOpenAI(
-                model=model_name,
-                temperature=0.7
-            )
-            
-            # System prompt - guides agent without hardcoded rules
-            self.system_prompt = """You are a helpful AI assistant with access to specialized tools.
+# System prompt - guides agent without hardcoded rules.
+# Kept as a single module-level constant so the leading system block is
+# byte-identical on every call and provider-side prompt caching can hit it.
+_SYSTEM_PROMPT: Final[str] = """You are a helpful AI assistant with access to specialized tools.
 
 Your capabilities:
 1. Fetch account details - Retrieve account information, balances, rewards, and facilities
@@ -68,45 +44,189 @@ IMPORTANT GUIDELINES:
   4. Set card_key to "account_overview" 
   5. Provide a helpful summary in final_response explaining what was retrieved
 
-CARD_KEY SELECTION RULES (read the AgentOutput.card_key field description for details):
-- "account_overview": Use when user explicitly requests COMPLETE/FULL account information
-- "facility_overview": Use when user explicitly requests COMPLETE/FULL facility information
-- "rewards_overview": Use when user explicitly requests COMPLETE/FULL rewards information
-- "order_overview": Use when user explicitly requests COMPLETE/FULL order information
-- "note_overview": Use when user requests to FETCH/LIST/DISPLAY/SHOW notes
+CARD_KEY SELECTION RULES:
+- "account_overview": Use ONLY when user explicitly requests COMPLETE/FULL account information
+  ✓ "show account overview", "account details", "account summary"  ✗ "what is the account balance?", "account name", "how many points?"
+- "facility_overview": Use ONLY when user explicitly requests COMPLETE/FULL facility information
+  ✓ "show facility overview", "facility details", "facility summary"  ✗ "what is the facility name?", "who is the sales rep?"
+- "rewards_overview": Use ONLY when user explicitly requests COMPLETE/FULL rewards information
+  ✓ "show rewards overview", "rewards details", "all rewards info"  ✗ "how many points?", "current tier"
+- "order_overview": Use ONLY when user explicitly requests COMPLETE/FULL order information
+  ✓ "show order overview", "order details", "all orders"  ✗ "order status", "last order date"
+- "note_overview": Use when user requests to FETCH/LIST/DISPLAY/SHOW notes, even if no notes are available
+  ✓ "fetch notes", "list notes", "show last 5 notes"  ✗ "summarize notes", "what did I note about X?"
 - "other": Use for specific single-field questions, greetings, follow-ups, or analysis requests
 
 When calling tools:
 - Extract account_id, facility_id, or user_id from the config if needed
+- When a query needs several independent lookups (e.g. account AND facility details), request all of those tool calls in the same step instead of one after another
 - Process the tool results and populate the appropriate overview fields in structured format
 - Provide a clear, helpful summary in final_response
 
 Always be helpful, accurate, and efficient. Make tool calls when you need data to answer the user's question."""
+
+
+# Shared read-only default for missing message/tool-call mappings
+_EMPTY: Final[Mapping[str, Any]] = MappingProxyType({})
+
+# Tool names identify the tool set a compiled graph was built with
+_TOOLS_SIGNATURE = tuple(t.name for t in ALL_TOOLS)
+
+# Compiled agent graphs shared process-wide, one per (model_name, service_tier, tools).
+# Each entry also records the API key hash and checkpointer it was built with; a
+# new key or checkpointer replaces the entry rather than adding another
+_GRAPH_CACHE: Dict[tuple, tuple] = {}
+
+
+def _turn_start(messages: List[Any]) -> int:
+    """
+    Find where the current turn starts in the agent state's messages
+    
+    Args:
+        messages: Agent state messages (message objects or dicts)
+        
+    Returns:
+        Index of the first message after the last user message (0 if there is none)
+    """
+    for index in range(len(messages) - 1, -1, -1):
+        msg = messages[index]
+        if isinstance(msg, dict):
+            if msg.get("role") in ("user", "human") or msg.get("type") == "human":
+                return index + 1
+        elif isinstance(msg, HumanMessage):
+            return index + 1
+    return 0
+
+
+def _dump_output(output: AgentOutput, tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert an AgentOutput into the flat response dict
+    
+    Args:
+        output: Structured agent output
+        tool_calls: Tool usage collected from the agent messages
+        
+    Returns:
+        Dictionary with flat structure matching expected format
+    """
+    # One pydantic-core traversal of the whole model instead of a model_dump per item
+    response = output.model_dump(mode="python")
+    # Keep the response contract: empty overview lists are None, notes are always a list
+    for key in ("account_overview", "rewards_overview", "facility_overview", "order_overview"):
+        if not response[key]:
+            response[key] = None
+    if response["note_overview"] is None:
+        response["note_overview"] = []
+    response["tool_calls"] = tool_calls
+    response["success"] = True
+    return response
+
+
+def _build_graph(
+    model_name: str,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    service_tier: Optional[str] = None
+) -> tuple:
+    """
+    Build the model, checkpointer and compiled agent graph
+    
+    Args:
+        model_name: OpenAI model to use
+        checkpointer: Optional checkpointer (defaults to a new InMemorySaver)
+        service_tier: Optional OpenAI processing tier (e.g. "priority"); account default when None
+        
+    Returns:
+        Tuple of (model, checkpointer, agent)
+    """
+    # Initialize OpenAI model - structured output will be handled by create_agent via response_format
+    # A service tier is only sent when configured, since faster tiers are billed at a premium
+    model_kwargs = {"service_tier": service_tier} if service_tier else {}
+    model = ChatOpenAI(
+        model=model_name,
+        temperature=0.7,
+        **model_kwargs
+    )
+    
+    # Initialize checkpointer for short-term memory
+    if checkpointer is None:
+        checkpointer = InMemorySaver()
+    
+    # Create the agent using LangChain v1's create_agent with response_format
+    # This automatically selects ProviderStrategy for OpenAI models or ToolStrategy for others
+    # The structured response will be in result["structured_response"]
+    agent = create_agent(
+        model=model,
+        tools=ALL_TOOLS,
+        system_prompt=_SYSTEM_PROMPT,
+        checkpointer=checkpointer,
+        response_format=AgentOutput  # Pass schema type directly - auto-selects best strategy
+    )
+    return model, checkpointer, agent
+
+
+class SingleAgent:
+    """
+    Single Agent that manages conversation and tool usage
+    Uses LangGraph for state management
+    """
+    
+    __slots__ = ("model", "system_prompt", "checkpointer", "agent")
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model_name: str = "gpt-4o-mini",
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        service_tier: Optional[str] = None
+    ):
+        """
+        Initialize the single agent with structured output
+        
+        Args:
+            api_key: OpenAI API key (defaults to env variable)
+            model_name: OpenAI model to use (defaults to gpt-4o-mini)
+            checkpointer: Optional checkpointer for conversation state (defaults to in-memory)
+            service_tier: Optional OpenAI processing tier, e.g. "priority" for lower latency at higher cost
+        """
+        try:
+            logger.info("Initializing SingleAgent with model: %s", model_name)
+            
+            # Set API key
+            if api_key:
+                os.environ["OPENAI_API_KEY"] = api_key
+            elif "OPENAI_API_KEY" not in os.environ:
+                raise ValueError("OPENAI_API_KEY must be provided or set in environment")
             
-            # Initialize checkpointer for short-term memory
-            self.checkpointer = InMemorySaver()
+            self.system_prompt = _SYSTEM_PROMPT
             
-            # Create the agent using LangChain v1's create_agent with response_format
-            # This automatically selects ProviderStrategy for OpenAI models or ToolStrategy for others
-            # The structured response will be in result["structured_response"]
-            self.agent = create_agent(
-                model=self.model,
-                tools=ALL_TOOLS,
-                system_prompt=self.system_prompt,
-                checkpointer=self.checkpointer,
-                response_format=AgentOutput  # Pass schema type directly - auto-selects best strategy
+            # Reuse the compiled graph when one already exists for this model/tool set.
+            # ChatOpenAI binds the API key at construction, so a graph is only reused
+            # for the same key (compared by hash, never stored) and checkpointer.
+            cache_key = (model_name, service_tier, _TOOLS_SIGNATURE)
+            built_with = (
+                hashlib.sha256(os.environ["OPENAI_API_KEY"].encode()).digest(),
+                checkpointer
             )
+            cached = _GRAPH_CACHE.get(cache_key)
+            if cached is None or cached[0] != built_with:
+                cached = _GRAPH_CACHE[cache_key] = (
+                    built_with,
+                    _build_graph(model_name, checkpointer, service_tier)
+                )
+            else:
+                logger.info("Reusing compiled agent graph for model: %s", model_name)
+            self.model, self.checkpointer, self.agent = cached[1]
             
             logger.info("SingleAgent initialized successfully with structured output")
             
         except Exception as e:
-            logger.error(f"Error initializing SingleAgent: {str(e)}", exc_info=True)
+            logger.error("Error initializing SingleAgent: %s", e, exc_info=True)
             raise
     
     def process_message(
         self,
         user_message: str,
-        conversation_history: List[Dict[str, str]],
+        conversation_history: Optional[List[Dict[str, str]]] = None,
         account_id: Optional[str] = None,
         facility_id: Optional[str] = None,
         user_id: Optional[str] = None,
@@ -117,7 +237,7 @@ Always be helpful, accurate, and efficient. Make tool calls when you need data t
         
         Args:
             user_message: The current user message
-            conversation_history: List of previous messages
+            conversation_history: Previous messages for stateless calls (ignored when conversation_id is set)
             account_id: Optional account ID (passed via config)
             facility_id: Optional facility ID (passed via config)
             user_id: Optional user ID (passed via config)
@@ -127,182 +247,406 @@ Always be helpful, accurate, and efficient. Make tool calls when you need data t
             Dictionary with flat structure matching expected format
         """
         try:
-            logger.info(f"Processing message in conversation: {conversation_id}")
-            logger.info(f"Message: {user_message[:100]}...")
+            messages, config = self._prepare_invocation(
+                user_message,
+                conversation_history,
+                account_id=account_id,
+                facility_id=facility_id,
+                user_id=user_id,
+                conversation_id=conversation_id
+            )
             
-            # Build messages list with history
-            messages = conversation_history.copy()
-            messages.append({"role": "user", "content": user_message})
+            # Invoke the agent - structured output will be in result["structured_response"]
+            result = self.agent.invoke({"messages": messages}, config)
+            return self._format_result(result)
             
-            # Prepare config with thread_id and IDs for tools
-            config = {"configurable": {}}
-            if conversation_id:
-                config["configurable"]["thread_id"] = conversation_id
-            if account_id:
-                config["configurable"]["account_id"] = account_id
-            if facility_id:
-                config["configurable"]["facility_id"] = facility_id
-            if user_id:
-                config["configurable"]["user_id"] = user_id
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def aprocess_message(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        account_id: Optional[str] = None,
+        facility_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a user message asynchronously using agent.ainvoke
+        
+        Lets a single event loop serve many concurrent conversations while
+        waiting on the LLM and tool round-trips.
+        
+        Args:
+            user_message: The current user message
+            conversation_history: Previous messages for stateless calls (ignored when conversation_id is set)
+            account_id: Optional account ID (passed via config)
+            facility_id: Optional facility ID (passed via config)
+            user_id: Optional user ID (passed via config)
+            conversation_id: Conversation ID for short-term memory
             
-            logger.info(f"Config: account_id={account_id}, facility_id={facility_id}, user_id={user_id}")
+        Returns:
+            Dictionary with flat structure matching expected format
+        """
+        try:
+            messages, config = self._prepare_invocation(
+                user_message,
+                conversation_history,
+                account_id=account_id,
+                facility_id=facility_id,
+                user_id=user_id,
+                conversation_id=conversation_id
+            )
             
             # Invoke the agent - structured output will be in result["structured_response"]
-            result = self.agent.invoke({"messages": messages}, config)
+            result = await self.agent.ainvoke({"messages": messages}, config)
+            return self._format_result(result)
             
-            # Extract structured output from agent response
-            # According to LangChain docs, structured output is in result["structured_response"]
-            structured_output = None
-            assistant_message = ""
-            tool_calls = []
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def astream_message(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        account_id: Optional[str] = None,
+        facility_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding events while the agent runs
+        
+        Token events carry the raw model output as it is generated; with
+        provider structured output that is the AgentOutput JSON.
+        
+        Args:
+            user_message: The current user message
+            conversation_history: Previous messages for stateless calls (ignored when conversation_id is set)
+            account_id: Optional account ID (passed via config)
+            facility_id: Optional facility ID (passed via config)
+            user_id: Optional user ID (passed via config)
+            conversation_id: Conversation ID for short-term memory
             
-            # Check for structured_response in result (as per LangChain documentation)
-            if "structured_response" in result:
-                structured_output = result["structured_response"]
-                if isinstance(structured_output, AgentOutput):
-                    assistant_message = structured_output.final_response
-                    logger.info(f"Found structured_response in result. Card key: {structured_output.card_key}")
+        Yields:
+            {"type": "token", "content": ...} for each model text chunk,
+            {"type": "tool", "tool": ...} when a tool returns, and finally
+            {"type": "final", "response": ...} with the process_message response
+        """
+        try:
+            messages, config = self._prepare_invocation(
+                user_message,
+                conversation_history,
+                account_id=account_id,
+                facility_id=facility_id,
+                user_id=user_id,
+                conversation_id=conversation_id
+            )
             
-            # Also extract messages for tool calls and fallback content
-            if "messages" in result:
-                # Get assistant message content for fallback
-                for msg in reversed(result["messages"]):
-                    if hasattr(msg, "content") and msg.content and not assistant_message:
-                        if isinstance(msg.content, str):
-                            assistant_message = msg.content
-                    elif isinstance(msg, dict) and msg.get("content") and not assistant_message:
-                        assistant_message = msg.get("content", "")
-                    
-                    if assistant_message:
-                        break
+            # "messages" streams LLM tokens and tool results, "values" the state after each step
+            final_state: Dict[str, Any] = {}
+            async for mode, chunk in self.agent.astream(
+                {"messages": messages},
+                config,
+                stream_mode=["messages", "values"]
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
                 
-                # Extract tool usage information
-                for msg in result["messages"]:
-                    if hasattr(msg, "additional_kwargs") and "tool_calls" in getattr(msg, "additional_kwargs", {}):
-                        for tool_call in msg.additional_kwargs["tool_calls"]:
-                            tool_calls.append({
-                                "tool": tool_call.get("function", {}).get("name"),
-                                "arguments": tool_call.get("function", {}).get("arguments")
-                            })
-                    elif isinstance(msg, dict) and msg.get("additional_kwargs", {}).get("tool_calls"):
-                        for tool_call in msg["additional_kwargs"]["tool_calls"]:
-                            tool_calls.append({
-                                "tool": tool_call.get("function", {}).get("name"),
-                                "arguments": tool_call.get("function", {}).get("arguments")
-                            })
+                message, _metadata = chunk
+                if isinstance(message, AIMessageChunk):
+                    if message.content and isinstance(message.content, str):
+                        yield {"type": "token", "content": message.content}
+                elif isinstance(message, ToolMessage):
+                    yield {"type": "tool", "tool": message.name}
             
-            # If we got structured output, use it directly
-            if structured_output and isinstance(structured_output, AgentOutput):
-                logger.info(f"Using structured output from agent. Card key: {structured_output.card_key}")
-                # Convert AgentOutput to dict format
-                response = {
-                    "final_response": structured_output.final_response,
-                    "card_key": structured_output.card_key,
-                    "account_overview": [
-                        acc.model_dump() for acc in (structured_output.account_overview or [])
-                    ] if structured_output.account_overview else None,
-                    "rewards_overview": [
-                        rew.model_dump() for rew in (structured_output.rewards_overview or [])
-                    ] if structured_output.rewards_overview else None,
-                    "facility_overview": [
-                        fac.model_dump() for fac in (structured_output.facility_overview or [])
-                    ] if structured_output.facility_overview else None,
-                    "order_overview": [
-                        ord.model_dump() for ord in (structured_output.order_overview or [])
-                    ] if structured_output.order_overview else None,
-                    "note_overview": [
-                        note.model_dump() for note in (structured_output.note_overview or [])
-                    ],
-                    "tool_calls": tool_calls,
-                    "success": True
-                }
-                logger.info(f"Message processed successfully. Card key: {structured_output.card_key}")
-                return response
+            response = self._format_result(final_state)
             
-            # Try parsing assistant_message as JSON and creating AgentOutput
-            if assistant_message and not structured_output:
-                try:
-                    import json
-                    # Try parsing as JSON
-                    if isinstance(assistant_message, str):
-                        parsed = json.loads(assistant_message)
-                    else:
-                        parsed = assistant_message
-                    
-                    if isinstance(parsed, dict):
-                        # Try to create AgentOutput from parsed dict
-                        structured_output = AgentOutput(**parsed)
-                        logger.info("Parsed structured output from message content")
-                        return {
-                            "final_response": structured_output.final_response,
-                            "card_key": structured_output.card_key,
-                            "account_overview": [
-                                acc.model_dump() for acc in (structured_output.account_overview or [])
-                            ] if structured_output.account_overview else None,
-                            "rewards_overview": [
-                                rew.model_dump() for rew in (structured_output.rewards_overview or [])
-                            ] if structured_output.rewards_overview else None,
-                            "facility_overview": [
-                                fac.model_dump() for fac in (structured_output.facility_overview or [])
-                            ] if structured_output.facility_overview else None,
-                            "order_overview": [
-                                ord.model_dump() for ord in (structured_output.order_overview or [])
-                            ] if structured_output.order_overview else None,
-                            "note_overview": [
-                                note.model_dump() for note in (structured_output.note_overview or [])
-                            ],
-                            "tool_calls": tool_calls,
-                            "success": True
-                        }
-                except Exception as parse_error:
-                    logger.debug(f"Could not parse structured output: {parse_error}")
-            
-            # Ultimate fallback - return basic response
-            logger.warning("Structured output not found, using basic fallback response")
-            return {
-                "final_response": assistant_message or "I'm here to help! How can I assist you?",
-                "card_key": "other",
-                "account_overview": None,
-                "rewards_overview": None,
-                "facility_overview": None,
-                "order_overview": None,
-                "note_overview": [],
-                "tool_calls": tool_calls,
-                "success": True
-            }
+        except Exception as e:
+            response = self._error_response(e)
+        
+        yield {"type": "final", "response": response}
+    
+    def process_messages(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process several messages with one batched agent call
+        
+        Items should belong to different conversations; turns of the same
+        conversation must be sent one after another.
+        
+        Args:
+            items: Keyword arguments for process_message, one dict per message
             
+        Returns:
+            List of response dictionaries in the same order as items
+        """
+        try:
+            prepared = [self._prepare_invocation(**item) for item in items]
+            results = self.agent.batch(
+                [{"messages": messages} for messages, _ in prepared],
+                [config for _, config in prepared],
+                return_exceptions=True
+            )
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}", exc_info=True)
-            return {
-                "final_response": f"I encountered an error: {str(e)}",
-                "card_key": "error",
-                "account_overview": None,
-                "rewards_overview": None,
-                "facility_overview": None,
-                "order_overview": None,
-                "note_overview": [],
-                "success": False,
-                "error": str(e)
-            }
+            return [self._error_response(e) for _ in items]
+        
+        responses = []
+        for result in results:
+            try:
+                if isinstance(result, Exception):
+                    # Re-raise so _error_response logs it with its traceback
+                    raise result
+                responses.append(self._format_result(result))
+            except Exception as e:
+                responses.append(self._error_response(e))
+        return responses
+    
+    async def aprocess_messages(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process several messages concurrently using aprocess_message
+        
+        Items should belong to different conversations; turns of the same
+        conversation must be sent one after another.
+        
+        Args:
+            items: Keyword arguments for aprocess_message, one dict per message
+            
+        Returns:
+            List of response dictionaries in the same order as items
+        """
+        return list(await asyncio.gather(*(self.aprocess_message(**item) for item in items)))
+    
+    async def arecord_turn(self, conversation_id: str, user_message: str, final_response: str) -> None:
+        """
+        Append a user/assistant exchange to a conversation without running the agent
+        
+        Used when a response is served from cache, so the checkpointed thread
+        still contains the turn for later messages.
+        
+        Args:
+            conversation_id: Conversation (thread) ID
+            user_message: The user message
+            final_response: The assistant reply that was returned
+        """
+        await self.agent.aupdate_state(
+            {"configurable": {"thread_id": conversation_id}},
+            {"messages": [HumanMessage(content=user_message), AIMessage(content=final_response)]},
+            as_node="model"
+        )
+    
+    def delete_conversation(self, conversation_id: str) -> None:
+        """
+        Delete the checkpointed state of a conversation
+        
+        Args:
+            conversation_id: Conversation (thread) ID to delete
+        """
+        logger.info("Deleting checkpointed conversation: %s", conversation_id)
+        self.checkpointer.delete_thread(conversation_id)
+    
+    async def adelete_conversation(self, conversation_id: str) -> None:
+        """
+        Delete the checkpointed state of a conversation asynchronously
+        
+        Args:
+            conversation_id: Conversation (thread) ID to delete
+        """
+        logger.info("Deleting checkpointed conversation: %s", conversation_id)
+        await self.checkpointer.adelete_thread(conversation_id)
+    
+    def _prepare_invocation(
+        self,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        account_id: Optional[str] = None,
+        facility_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Build the agent input messages and config for a user message
+        
+        Args:
+            user_message: The current user message
+            conversation_history: Previous messages for stateless calls (ignored when conversation_id is set)
+            account_id: Optional account ID (passed via config)
+            facility_id: Optional facility ID (passed via config)
+            user_id: Optional user ID (passed via config)
+            conversation_id: Conversation ID for short-term memory
+            
+        Returns:
+            Tuple of (messages, config)
+        """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Processing message in conversation: %s", conversation_id)
+            logger.info("Message: %.100s...", user_message)
+            logger.info(
+                "Config: account_id=%s, facility_id=%s, user_id=%s",
+                account_id, facility_id, user_id
+            )
+        
+        # With a thread_id the checkpointer already holds the prior turns, so only
+        # the new user message is sent; stateless calls carry the full history
+        user_turn = {"role": "user", "content": user_message}
+        if conversation_id:
+            messages = [user_turn]
+        else:
+            messages = [*(conversation_history or ()), user_turn]
+        
+        # Prepare config with thread_id and IDs for tools (unset IDs are left out)
+        config = {"configurable": {
+            key: value
+            for key, value in (
+                ("thread_id", conversation_id),
+                ("account_id", account_id),
+                ("facility_id", facility_id),
+                ("user_id", user_id)
+            )
+            if value
+        }}
+        return messages, config
+    
+    def _format_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert the raw agent result into the flat response format
+        
+        Args:
+            result: Agent state returned by invoke/ainvoke
+            
+        Returns:
+            Dictionary with flat structure matching expected format
+        """
+        # Extract structured output from agent response
+        # According to LangChain docs, structured output is in result["structured_response"]
+        assistant_message = ""
+        tool_calls = []
+        
+        # Check for structured_response in result (as per LangChain documentation)
+        structured_output = result.get("structured_response")
+        is_agent_output = isinstance(structured_output, AgentOutput)
+        if is_agent_output:
+            assistant_message = structured_output.final_response
+            logger.info("Found structured_response in result. Card key: %s", structured_output.card_key)
+        
+        # Single forward pass: collect tool usage and, only when there is no
+        # structured output, remember the latest non-empty content as the
+        # fallback assistant message
+        track_content = not is_agent_output
+        last_content = ""
+        # With a checkpointed thread the state holds the whole conversation, so
+        # only messages after the latest user message belong to this response
+        messages = result.get("messages") or []
+        for msg in islice(messages, _turn_start(messages), None):
+            if isinstance(msg, dict):
+                additional_kwargs = msg.get("additional_kwargs") or _EMPTY
+                if track_content:
+                    content = msg.get("content")
+                    if content:
+                        last_content = content
+            else:
+                additional_kwargs = getattr(msg, "additional_kwargs", None) or _EMPTY
+                if track_content:
+                    content = getattr(msg, "content", None)
+                    if content and isinstance(content, str):
+                        last_content = content
+            
+            # Extract tool usage information
+            for tool_call in additional_kwargs.get("tool_calls") or ():
+                function = tool_call.get("function") or _EMPTY
+                tool_calls.append({
+                    "tool": function.get("name"),
+                    "arguments": function.get("arguments")
+                })
+        
+        if not assistant_message:
+            assistant_message = last_content
+        
+        # If we got structured output, use it directly
+        if is_agent_output:
+            logger.info("Using structured output from agent. Card key: %s", structured_output.card_key)
+            response = _dump_output(structured_output, tool_calls)
+            logger.info("Message processed successfully. Card key: %s", structured_output.card_key)
+            return response
+        
+        # Try parsing assistant_message as JSON and creating AgentOutput
+        # Only a JSON object can be an AgentOutput, so plain-text replies skip parsing
+        if assistant_message and not structured_output and assistant_message.lstrip().startswith("{"):
+            try:
+                # pydantic-core parses and validates the JSON in one pass, without an intermediate dict
+                structured_output = AgentOutput.model_validate_json(assistant_message)
+                logger.info("Parsed structured output from message content")
+                return _dump_output(structured_output, tool_calls)
+            except ValueError as parse_error:
+                # ValidationError (including invalid JSON) is a ValueError
+                logger.debug("Could not parse structured output: %s", parse_error)
+        
+        # Ultimate fallback - return basic response
+        logger.warning("Structured output not found, using basic fallback response")
+        return {
+            "final_response": assistant_message or "I'm here to help! How can I assist you?",
+            "card_key": "other",
+            "account_overview": None,
+            "rewards_overview": None,
+            "facility_overview": None,
+            "order_overview": None,
+            "note_overview": [],
+            "tool_calls": tool_calls,
+            "success": True
+        }
+    
+    def _error_response(self, e: Exception) -> Dict[str, Any]:
+        """
+        Build the error response for a failed message
+        
+        Args:
+            e: Exception raised while processing the message
+            
+        Returns:
+            Dictionary with flat structure and error details
+        """
+        logger.error("Error processing message: %s", e, exc_info=True)
+        return {
+            "final_response": f"I encountered an error: {str(e)}",
+            "card_key": "error",
+            "account_overview": None,
+            "rewards_overview": None,
+            "facility_overview": None,
+            "order_overview": None,
+            "note_overview": [],
+            "success": False,
+            "error": str(e)
+        }
     
 
 
-# Global instance (will be initialized in main.py)
+# Global instance (initialized once at application startup by main.py)
 _agent_instance = None
 
 
 def get_agent() -> SingleAgent:
-    """Get the global agent instance"""
+    """Get the global agent instance (built lazily if startup did not initialize it)"""
     global _agent_instance
     if _agent_instance is None:
         _agent_instance = SingleAgent()
     return _agent_instance
 
 
-def initialize_agent(api_key: Optional[str] = None, model_name: str = "gpt-4o-mini"):
-    """Initialize the global agent instance"""
+def initialize_agent(
+    api_key: Optional[str] = None,
+    model_name: str = "gpt-4o-mini",
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    service_tier: Optional[str] = None
+):
+    """Initialize the global agent instance (reuses a cached graph for the same model and key)"""
     global _agent_instance
-    _agent_instance = SingleAgent(api_key=api_key, model_name=model_name)
+    _agent_instance = SingleAgent(
+        api_key=api_key,
+        model_name=model_name,
+        checkpointer=checkpointer,
+        service_tier=service_tier
+    )
     return _agent_instance
 
 
@@ -50,7 +50,8 @@ def fetch_facility_details(config: RunnableConfig, facility_id: Optional[str] =
         facility_id: Optional facility ID. If not provided, will be extracted from config.
         
     Returns:
-        Dictionary with facility details or error message
+        Dictionary with facility details, all facilities of the account in config
+        when no facility ID is available, or error message
         
     Use this tool when user requests:
     - Facility information, facility details, facility overview
@@ -62,9 +63,13 @@ def fetch_facility_details(config: RunnableConfig, facility_id: Optional[str] =
         facility_id = config.get("configurable", {}).get("facility_id")
     
     if not facility_id:
+        # Without a facility ID, fall back to every facility of the account in config
+        account_id = config.get("configurable", {}).get("account_id")
+        if account_id:
+            return facility_service.get_facilities_by_account(account_id)
         return {
             "success": False,
-            "error": "facility_id is required. Please provide it in the request or config."
+            "error": "facility_id or account_id is required. Please provide it in the request or config."
         }
     
     return facility_service.get_facility_details(facility_id)
@@ -161,7 +166,10 @@ def fetch_notes(
         account_id=account_id,
         date=date,
         last_n=last_n,
-        order=order
+        order=order,
+        first_limit=first_limit,
+        from_date=from_date,
+        to_date=to_date
     )
 
 
@@ -3,11 +3,13 @@ Response Models for Structured Output
 Pydantic models for structured agent responses
 """
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AccountOverview(BaseModel):
     """Account overview model for structured output"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     account_id: str
     name: Optional[str] = None
     status: Optional[str] = None
@@ -22,6 +24,8 @@ class AccountOverview(BaseModel):
 
 class FacilityOverview(BaseModel):
     """Facility overview model for structured output"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     id: str
     name: Optional[str] = None
     status: Optional[str] = None
@@ -35,6 +39,8 @@ class FacilityOverview(BaseModel):
 
 class RewardOverview(BaseModel):
     """Reward overview model"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     current_tier: Optional[str] = None
     next_tier: Optional[str] = None
     points_to_next_tier: Optional[int] = None
@@ -46,6 +52,8 @@ class RewardOverview(BaseModel):
 
 class OrderOverview(BaseModel):
     """Order overview model"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     order_id: Optional[str] = None
     status: Optional[str] = None
     amount: Optional[float] = None
@@ -53,6 +61,8 @@ class OrderOverview(BaseModel):
 
 class NoteOverview(BaseModel):
     """Note overview model"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     note_id: Optional[str] = None
     content: Optional[str] = None
     created_at: Optional[str] = None
@@ -91,57 +101,11 @@ class AgentOutput(BaseModel):
     
     card_key: str = Field(
         default="other",
-        description="""Select the appropriate card key based on user's query. CRITICAL: Read all rules carefully.
-
-VALID VALUES:
-- "account_overview"
-- "facility_overview"
-- "rewards_overview"
-- "order_overview"
-- "note_overview"
-- "other"
-
-SELECTION RULES:
-
-1. "account_overview":
-   Use ONLY when user explicitly requests COMPLETE/FULL account information:
-   ✓ Valid queries: "show account overview", "account details", "account summary", "full account info"
-   ✗ Invalid: "what is the account balance?", "show invoices", "account name", "how many points?"
-   Rule: If query asks about ONE specific account field → use "other"
-
-2. "facility_overview":
-   Use ONLY when user explicitly requests COMPLETE/FULL facility information:
-   ✓ Valid queries: "show facility overview", "facility details", "facility summary", "full facility info"
-   ✗ Invalid: "what is the facility name?", "facility address", "who is the sales rep?"
-   Rule: If query asks about ONE specific facility field → use "other"
-
-3. "rewards_overview":
-   Use ONLY when user explicitly requests COMPLETE/FULL rewards information:
-   ✓ Valid queries: "show rewards overview", "rewards details", "rewards summary", "all rewards info"
-   ✗ Invalid: "how many points?", "current tier", "what's my loyalty status?"
-   Rule: If query asks about ONE specific rewards field → use "other"
-
-4. "order_overview":
-   Use ONLY when user explicitly requests COMPLETE/FULL order information:
-   ✓ Valid queries: "show order overview", "order details", "order summary", "all orders"
-   ✗ Invalid: "order status", "last order date", "pending orders count"
-   Rule: If query asks about ONE specific order field → use "other"
-
-5. "note_overview":
-   Use ONLY when user explicitly requests to FETCH/LIST/DISPLAY/SHOW notes:
-   ✓ Valid queries: "fetch notes", "show notes", "display notes", "list notes", "fetch notes from 2024-01-01", "show last 5 notes"
-   ✗ Invalid: "summarize notes", "analyze notes", "what did I note about X?"
-   SPECIAL RULE: Set as "note_overview" even if no notes available (user asked to fetch)
-   Rule: If user wants to ANALYZE/PROCESS notes → use "other"
-
-6. "other":
-   Use for:
-   - Specific questions about one field ("what is the balance?", "current tier?")
-   - Greetings and general conversation
-   - Follow-up questions
-   - Analysis or processing requests
-   - Any query that doesn't explicitly request a FULL/COMPLETE overview"""
+        description=(
+            "One of: account_overview|facility_overview|rewards_overview|order_overview|note_overview|other. "
+            "Use *_overview only for explicit full-overview requests (note_overview for fetching/listing notes, "
+            "even if none exist); use 'other' for single-field, conversational or analysis queries."
+        )
     )
 
-    class Config:
-        extra = "forbid"
+    model_config = ConfigDict(extra="forbid", frozen=True)
@@ -2,9 +2,12 @@
 API Routes
 FastAPI endpoints for the LangChain v1 single agent
 """
+import json
 import logging
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, status
-from typing import Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import Any, Dict, Optional
 
 from api.schemas import (
     CreateSessionRequest,
@@ -16,43 +19,78 @@ from api.schemas import (
     HealthResponse
 )
 from services import session_service
+from services.response_cache import response_cache
+# Module import (not "from agent import get_agent"): agent.single_agent imports
+# api.response_models, so get_agent is resolved when a request is handled
+from agent import single_agent
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# orjson is optional; when installed, hot JSON responses are encoded with it
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
+
 # Create API router
 router = APIRouter()
 
 
+# The root payload never changes, so it is encoded once at import
+_ROOT_BODY = json.dumps({
+    "name": "LangGraph Single Agent API",
+    "version": "1.0.0",
+    "description": "LangGraph + OpenAI Multi-Tool Agentic System",
+    "endpoints": {
+        "health": "GET /health",
+        "create_session": "POST /sessions",
+        "chat": "POST /chat",
+        "chat_stream": "POST /chat/stream",
+        "list_sessions": "GET /sessions",
+        "get_session": "GET /sessions/{session_id}",
+        "delete_session": "DELETE /sessions/{session_id}",
+        "get_history": "GET /sessions/{session_id}/history"
+    },
+    "docs": "/docs",
+    "openapi": "/openapi.json"
+}).encode()
+
+
+def _chat_response_body(conversation_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the ChatResponse body from an agent result
+    
+    Args:
+        conversation_id: Conversation the result belongs to
+        result: Agent response dictionary
+        
+    Returns:
+        Dictionary with exactly the ChatResponse fields
+    """
+    return {
+        "conversation_id": conversation_id,
+        "final_response": result["final_response"],
+        "card_key": result["card_key"],
+        "account_overview": result.get("account_overview"),
+        "rewards_overview": result.get("rewards_overview"),
+        "facility_overview": result.get("facility_overview"),
+        "order_overview": result.get("order_overview"),
+        "note_overview": result.get("note_overview", [])
+    }
+
+
 @router.get("/", tags=["Root"])
 async def root():
     """Root endpoint with API information"""
-    return {
-        "name": "LangGraph Single Agent API",
-        "version": "1.0.0",
-        "description": "LangGraph + OpenAI Multi-Tool Agentic System",
-        "endpoints": {
-            "health": "GET /health",
-            "create_session": "POST /sessions",
-            "chat": "POST /chat",
-            "list_sessions": "GET /sessions",
-            "get_session": "GET /sessions/{session_id}",
-            "delete_session": "DELETE /sessions/{session_id}",
-            "get_history": "GET /sessions/{session_id}/history"
-        },
-        "docs": "/docs",
-        "openapi": "/openapi.json"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @router.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    from agent import get_agent
-    agent = get_agent()
-    model_name = getattr(agent.model, "model_name", "gpt-4o-mini") if hasattr(agent, "model") else "gpt-4o-mini"
-    return HealthResponse(
+    model_name = getattr(single_agent.get_agent().model, "model_name", "gpt-4o-mini")
+    return HealthResponse.model_construct(
         status="healthy",
         agent_model=model_name,
         active_sessions=len(session_service.sessions)
@@ -73,10 +111,12 @@ async def create_session(request: CreateSessionRequest):
     """
     session = session_service.create_session(user_id=request.user_id)
     
-    return CreateSessionResponse(
+    # Response models below are built from internally produced data, so
+    # model_construct skips re-validating it (FastAPI still checks response_model)
+    return CreateSessionResponse.model_construct(
         conversation_id=session.session_id,
         user_id=request.user_id,
-        created_at=session.created_at.isoformat()
+        created_at=session.created_at_iso
     )
 
 
@@ -94,70 +134,137 @@ async def chat(request: ChatRequest):
     Returns natural language response and structured data in flat format.
     """
     try:
-        logger.info(f"Chat request received for conversation: {request.conversation_id}")
+        logger.info("Chat request received for conversation: %s", request.conversation_id)
         
         # Verify conversation exists
         session = session_service.get_session(request.conversation_id)
         if not session:
-            logger.warning(f"Conversation not found: {request.conversation_id}")
+            logger.warning("Conversation not found: %s", request.conversation_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Conversation '{request.conversation_id}' not found"
             )
         
-        # Get conversation history
-        conversation_history = session_service.get_conversation_history(request.conversation_id)
-        logger.info(f"Conversation history length: {len(conversation_history)}")
+        # Repeated requests with the same recent context are served from cache.
+        # The cache is opt-in, so history is only read to build a key when it is on
+        cache_key = None
+        result = None
+        if response_cache.enabled:
+            cache_key = response_cache.make_key(
+                session_service.get_conversation_history(request.conversation_id),
+                request.text,
+                account_id=request.account_id,
+                facility_id=request.facility_id,
+                user_id=request.user_id
+            )
+            result = response_cache.get(cache_key)
         
-        # Get agent and process message with context
-        from agent import get_agent
-        agent = get_agent()
-        result = agent.process_message(
-            user_message=request.text,
-            conversation_history=conversation_history,
-            account_id=request.account_id,
-            facility_id=request.facility_id,
-            user_id=request.user_id,
-            conversation_id=request.conversation_id  # Pass conversation_id for memory
-        )
+        agent = single_agent.get_agent()
+        if result is not None:
+            logger.info("Serving cached response for conversation: %s", request.conversation_id)
+            # Keep the agent's memory of this conversation in step with the session
+            await agent.arecord_turn(request.conversation_id, request.text, result["final_response"])
+        else:
+            # Prior turns come from the agent's checkpointer for this conversation_id,
+            # so the session history is not re-sent on every turn.
+            result = await agent.aprocess_message(
+                user_message=request.text,
+                account_id=request.account_id,
+                facility_id=request.facility_id,
+                user_id=request.user_id,
+                conversation_id=request.conversation_id  # Pass conversation_id for memory
+            )
+            if cache_key is not None:
+                response_cache.set(cache_key, result)
         
-        logger.info(f"Message processed. Card key: {result['card_key']}")
+        logger.info("Message processed. Card key: %s", result['card_key'])
         
-        # Add user message to session
+        # Add user message and assistant response to session with one shared timestamp
+        now = datetime.utcnow()
         session_service.add_message(
             session_id=request.conversation_id,
             role="user",
-            content=request.text
+            content=request.text,
+            timestamp=now
         )
-        
-        # Add assistant response to session
         session_service.add_message(
             session_id=request.conversation_id,
             role="assistant",
-            content=result["final_response"]
+            content=result["final_response"],
+            timestamp=now
         )
         
-        return ChatResponse(
-            conversation_id=request.conversation_id,
-            final_response=result["final_response"],
-            card_key=result["card_key"],
-            account_overview=result.get("account_overview"),
-            rewards_overview=result.get("rewards_overview"),
-            facility_overview=result.get("facility_overview"),
-            order_overview=result.get("order_overview"),
-            note_overview=result.get("note_overview", [])
-        )
+        # The agent result already has the ChatResponse shape with JSON-native values,
+        # so it is encoded directly; response_model only documents the schema
+        return FastJSONResponse(_chat_response_body(request.conversation_id, result))
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing chat message: {str(e)}", exc_info=True)
+        logger.error("Error processing chat message: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing message: {str(e)}"
         )
 
 
+@router.post("/chat/stream", tags=["Chat"])
+async def chat_stream(request: ChatRequest):
+    """
+    Send a message to the single agent and stream the reply as Server-Sent Events
+    
+    Takes the same body as POST /chat. Emits `token` events with model output
+    as it is generated, `tool` events when a tool returns, and a final `final`
+    event whose `response` has the same fields as the /chat response.
+    """
+    logger.info("Streaming chat request received for conversation: %s", request.conversation_id)
+    
+    # Verify conversation exists before the stream starts so a 404 is still possible
+    session = session_service.get_session(request.conversation_id)
+    if not session:
+        logger.warning("Conversation not found: %s", request.conversation_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Conversation '{request.conversation_id}' not found"
+        )
+    
+    agent = single_agent.get_agent()
+    
+    async def event_stream():
+        async for event in agent.astream_message(
+            user_message=request.text,
+            account_id=request.account_id,
+            facility_id=request.facility_id,
+            user_id=request.user_id,
+            conversation_id=request.conversation_id
+        ):
+            if event["type"] == "final":
+                result = event["response"]
+                logger.info("Message streamed. Card key: %s", result['card_key'])
+                
+                # Save the turn once the full response is known, with one shared timestamp
+                now = datetime.utcnow()
+                session_service.add_message(
+                    session_id=request.conversation_id,
+                    role="user",
+                    content=request.text,
+                    timestamp=now
+                )
+                session_service.add_message(
+                    session_id=request.conversation_id,
+                    role="assistant",
+                    content=result["final_response"],
+                    timestamp=now
+                )
+                event = {
+                    "type": "final",
+                    "response": _chat_response_body(request.conversation_id, result)
+                }
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get("/sessions", response_model=list[SessionInfo], tags=["Sessions"])
 async def list_sessions(user_id: Optional[str] = None):
     """
@@ -166,7 +273,7 @@ async def list_sessions(user_id: Optional[str] = None):
     - **user_id**: Optional filter by user ID
     """
     sessions = session_service.list_sessions(user_id=user_id)
-    return [SessionInfo(**session) for session in sessions]
+    return [SessionInfo.model_construct(**session) for session in sessions]
 
 
 @router.get("/sessions/{session_id}", response_model=SessionInfo, tags=["Sessions"])
@@ -183,11 +290,11 @@ async def get_session(session_id: str):
             detail=f"Session '{session_id}' not found"
         )
     
-    return SessionInfo(
+    return SessionInfo.model_construct(
         session_id=session.session_id,
         user_id=session.user_id,
-        created_at=session.created_at.isoformat(),
-        updated_at=session.updated_at.isoformat(),
+        created_at=session.created_at_iso,
+        updated_at=session.updated_at_iso,
         message_count=len(session.messages)
     )
 
@@ -206,6 +313,12 @@ async def delete_session(session_id: str):
             detail=f"Session '{session_id}' not found"
         )
     
+    # Drop the agent's checkpointed state so deleted conversations don't accumulate
+    try:
+        await single_agent.get_agent().adelete_conversation(session_id)
+    except Exception as e:
+        logger.warning("Could not delete checkpointed state for session %s: %s", session_id, e)
+    
     return {"message": f"Session '{session_id}' deleted successfully"}
 
 
@@ -231,22 +344,8 @@ async def get_conversation_history(
             detail=f"Session '{session_id}' not found"
         )
     
-    if include_metadata:
-        messages = [
-            {
-                "role": msg.role,
-                "content": msg.content,
-                "timestamp": msg.timestamp.isoformat()
-            }
-            for msg in session.messages
-        ]
-    else:
-        messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in session.messages
-        ]
-    
-    return ConversationHistory(
-        session_id=session_id,
-        messages=messages
-    )
+    # The session's read-only history view, built on first read and extended incrementally
+    messages = session_service.get_conversation_history(session_id, include_metadata=include_metadata)
+    
+    # Encoded directly; response_model only documents the schema
+    return FastJSONResponse({"session_id": session_id, "messages": messages})
@@ -38,7 +38,7 @@ class ChatResponse(BaseModel):
     final_response: str = Field(..., description="Natural language response")
     card_key: str = Field(..., description="Card key to determine UI display")
     account_overview: Optional[List[Dict[str, Any]]] = Field(None, description="Account data if requested")
-    rewards_overview: Optional[Dict[str, Any]] = Field(None, description="Rewards data if requested")
+    rewards_overview: Optional[List[Dict[str, Any]]] = Field(None, description="Rewards data if requested")
     facility_overview: Optional[List[Dict[str, Any]]] = Field(None, description="Facility data if requested")
     order_overview: Optional[List[Dict[str, Any]]] = Field(None, description="Order data if requested")
     note_overview: Optional[List[Dict[str, Any]]] = Field(None, description="Notes data if requested")
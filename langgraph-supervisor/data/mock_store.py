@@ -2,10 +2,18 @@
 Mock Data Store
 In-memory storage for accounts, facilities, and notes
 """
+import heapq
+from dataclasses import asdict
+from bisect import bisect_left, insort
+from operator import attrgetter
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 from data.models import Account, Facility, Note
 
+# Sort key for the created_at-ordered note lists (bisect/insort key= needs Python 3.10+)
+_created_at = attrgetter("created_at")
+
 
 class MockDataStore:
     """Centralized mock data storage"""
@@ -14,9 +22,11 @@ class MockDataStore:
         """Initialize mock data"""
         self._initialize_accounts()
         self._initialize_facilities()
+        self._index_facilities()
+        self._build_dict_views()
         # Legacy user-based notes (kept for compatibility)
         self.notes: Dict[str, List[Note]] = {}
-        # Account-based notes (preferred)
+        # Account-based notes (preferred), each list kept sorted by created_at
         self.account_notes: Dict[str, List[Note]] = {}
         self._initialize_notes()
     
@@ -134,9 +144,30 @@ class MockDataStore:
             )
         }
     
+    def _index_facilities(self):
+        """Build the account_id -> facilities index"""
+        self.facilities_by_account: Dict[str, List[Facility]] = defaultdict(list)
+        for facility in self.facilities.values():
+            self.facilities_by_account[facility.account_id].append(facility)
+    
+    def _build_dict_views(self):
+        """Serialize the read-only accounts and facilities once, for sharing across responses"""
+        self.account_dicts: Dict[str, Dict[str, Any]] = {
+            account_id: asdict(account) for account_id, account in self.accounts.items()
+        }
+        self.facility_dicts: Dict[str, Dict[str, Any]] = {
+            facility_id: asdict(facility) for facility_id, facility in self.facilities.items()
+        }
+        self.facility_dicts_by_account: Dict[str, List[Dict[str, Any]]] = {
+            account_id: [self.facility_dicts[facility.id] for facility in facilities]
+            for account_id, facilities in self.facilities_by_account.items()
+        }
+        # Full overview lists, shared by every list request
+        self.all_account_dicts: List[Dict[str, Any]] = list(self.account_dicts.values())
+        self.all_facility_dicts: List[Dict[str, Any]] = list(self.facility_dicts.values())
+    
     def _initialize_notes(self):
         """Seed mock notes for demo/testing"""
-        from datetime import datetime, timedelta
         users = [
             "sumer.choudhary@bitcot.com",
             "kaushal.sethia.c@evolus.com"
@@ -193,49 +224,87 @@ class MockDataStore:
         """Get all facilities"""
         return list(self.facilities.values())
     
+    def get_facilities_by_account(self, account_id: str) -> List[Facility]:
+        """Get facilities belonging to an account"""
+        return self.facilities_by_account.get(account_id, [])
+    
+    def get_account_dict(self, account_id: str) -> Optional[Dict[str, Any]]:
+        """Get the shared, read-only dict form of an account"""
+        return self.account_dicts.get(account_id)
+    
+    def get_facility_dict(self, facility_id: str) -> Optional[Dict[str, Any]]:
+        """Get the shared, read-only dict form of a facility"""
+        return self.facility_dicts.get(facility_id)
+    
+    def get_facility_dicts_by_account(self, account_id: str) -> List[Dict[str, Any]]:
+        """Get the shared, read-only dict forms of an account's facilities"""
+        return self.facility_dicts_by_account.get(account_id, [])
+    
     def save_note(self, account_id: str, content: str) -> Note:
         """Save a note under an account"""
         if account_id not in self.account_notes:
             self.account_notes[account_id] = []
         
+        now = datetime.utcnow()
         note = Note(
             note_id=f"AN-{len(self.account_notes[account_id]) + 1:06d}",
             user_id=f"account:{account_id}",
             content=content,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
-        self.account_notes[account_id].append(note)
+        # Keep the list sorted by created_at (new notes normally land at the end)
+        insort(self.account_notes[account_id], note, key=_created_at)
         return note
     
     def get_notes(
         self,
         account_id: Optional[str] = None,
         date: Optional[str] = None,
-        last_n: int = 5,
-        order: str = "desc"
+        last_n: Optional[int] = 5,
+        order: str = "desc",
+        first_limit: Optional[int] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None
     ) -> List[Note]:
-        """Get notes with optional filters and ordering (account-scoped)"""
-        all_notes: List[Note] = []
+        """
+        Get notes with optional filters and ordering (account-scoped)
         
+        Dates are YYYY-MM-DD and the from/to range is inclusive. first_limit keeps
+        the oldest N notes, otherwise last_n keeps the newest N; the result is then
+        ordered newest first ("desc") or oldest first ("asc").
+        """
+        # Per-account lists are already sorted by created_at, so no sort is needed
         if account_id:
             all_notes = self.account_notes.get(account_id, [])
         else:
             # Aggregate all account notes
-            for acc_notes in self.account_notes.values():
-                all_notes.extend(acc_notes)
+            all_notes = list(heapq.merge(*self.account_notes.values(), key=_created_at))
         
-        if date:
-            all_notes = [
-                note for note in all_notes
-                if note.created_at.strftime("%Y-%m-%d") == date
-            ]
+        # Date filters become a [lo, hi) slice found by binary search
+        lo, hi = 0, len(all_notes)
+        start = max(d for d in (date, from_date) if d) if (date or from_date) else None
+        end = min(d for d in (date, to_date) if d) if (date or to_date) else None
+        try:
+            if start:
+                lo = bisect_left(all_notes, datetime.fromisoformat(start), key=_created_at)
+            if end:
+                hi = bisect_left(all_notes, datetime.fromisoformat(end) + timedelta(days=1), key=_created_at)
+        except ValueError:
+            # Unparseable date - nothing can match it
+            return []
+        
+        # Slicing copies, so the stored notes are never reordered
+        all_notes = all_notes[lo:hi]
+        if first_limit is not None:
+            all_notes = all_notes[:max(first_limit, 0)]
+        elif last_n is not None:
+            all_notes = all_notes[-last_n:] if last_n > 0 else []
         
-        # Sort
-        reverse = order != "asc"
-        all_notes.sort(key=lambda x: x.created_at, reverse=reverse)
-        return all_notes[:last_n]
+        if order != "asc":
+            all_notes.reverse()
+        return all_notes
 
 
 # Global instance
@@ -1,13 +1,15 @@
 """
 Data Models
-Pydantic models for all data structures
+Dataclasses for internal data structures
+(API request/response validation stays in the pydantic schemas under api/)
 """
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
 from datetime import datetime
 
 
-class Account(BaseModel):
+@dataclass(slots=True, kw_only=True, frozen=True)
+class Account:
     """Account data model"""
     account_id: str
     name: str
@@ -21,7 +23,7 @@ class Account(BaseModel):
     address_state: str
     address_postal_code: str
     address_country: str = ""
-    facilities: List[Dict[str, Any]] = []
+    facilities: List[Dict[str, Any]] = field(default_factory=list)
     total_amount_due: float = 0.0
     total_amount_due_this_week: float = 0.0
     invoice_id: str = ""
@@ -42,7 +44,8 @@ class Account(BaseModel):
     evolux_level: str = ""
 
 
-class Facility(BaseModel):
+@dataclass(slots=True, kw_only=True, frozen=True)
+class Facility:
     """Facility data model"""
     id: str
     name: str
@@ -74,7 +77,8 @@ class Facility(BaseModel):
     agreement_type: str = ""
 
 
-class Note(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Note:
     """Note data model"""
     note_id: str
     user_id: str
@@ -83,17 +87,30 @@ class Note(BaseModel):
     updated_at: datetime
 
 
-class Message(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Message:
     """Chat message model"""
     role: str
     content: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = field(default_factory=datetime.utcnow)
 
 
-class Session(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class Session:
     """Session data model"""
     session_id: str
     user_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    messages: List[Message] = []
+    messages: List[Message] = field(default_factory=list)
+    # created_at never changes, so its ISO string is formatted once; the
+    # updated_at string is refreshed by SessionService whenever updated_at moves
+    created_at_iso: str = field(init=False, repr=False, compare=False)
+    updated_at_iso: str = field(init=False, repr=False, compare=False)
+    # Read-only history views, caught up with messages by SessionService when read
+    history: List[Dict[str, str]] = field(default_factory=list, repr=False, compare=False)
+    history_with_metadata: List[Dict[str, str]] = field(default_factory=list, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.created_at_iso = self.created_at.isoformat()
+        self.updated_at_iso = self.updated_at.isoformat()
@@ -5,6 +5,9 @@ Supports both API server and CLI modes
 """
 import os
 import sys
+import asyncio
+import json
+import logging
 import argparse
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -13,32 +16,66 @@ import uvicorn
 from contextlib import asynccontextmanager
 
 from api import router
-from agent import initialize_agent, get_agent
+from agent import initialize_agent, get_agent, open_checkpointer, aopen_checkpointer
 from services import session_service
+from services.response_cache import response_cache
 
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging once for the whole application
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pending checkpoint deletions for evicted sessions (referenced so they are not garbage collected)
+_eviction_tasks: set = set()
+
+
+async def _delete_evicted_conversation(session_id: str) -> None:
+    """Drop an evicted session's checkpointed agent state, as DELETE /sessions does"""
+    try:
+        await get_agent().adelete_conversation(session_id)
+    except Exception as e:
+        logger.warning("Could not delete checkpointed state for evicted session %s: %s", session_id, e)
+
+
+def _on_session_evicted(session_id: str) -> None:
+    """Schedule checkpoint cleanup for a session evicted by SessionService"""
+    task = asyncio.get_running_loop().create_task(_delete_evicted_conversation(session_id))
+    _eviction_tasks.add(task)
+    task.add_done_callback(_eviction_tasks.discard)
+
 # Lifespan handler to avoid deprecated on_event
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: initialize agent
     api_key = os.getenv("OPENAI_API_KEY")
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    if not api_key:
-        print("WARNING: OPENAI_API_KEY not found in environment. Set it in .env to enable the agent.")
-    else:
-        try:
-            initialize_agent(api_key=api_key, model_name=model_name)
-            print("SUCCESS: Agent initialized")
-            print(f"Model: {model_name}")
-        except Exception as e:
-            print(f"ERROR: Error initializing agent: {e}")
-    # Yield to run app
-    yield
-    # Shutdown
-    print("Shutting down Single Agent API")
+    service_tier = os.getenv("OPENAI_SERVICE_TIER") or None
+    response_cache.configure(ttl=float(os.getenv("RESPONSE_CACHE_TTL", "0")))
+    session_service.max_sessions = int(os.getenv("MAX_SESSIONS", "10000"))
+    session_service.on_evict = _on_session_evicted
+    # The checkpointer stays open for the lifetime of the app
+    async with aopen_checkpointer() as checkpointer:
+        if not api_key:
+            print("WARNING: OPENAI_API_KEY not found in environment. Set it in .env to enable the agent.")
+        else:
+            try:
+                initialize_agent(
+                    api_key=api_key,
+                    model_name=model_name,
+                    checkpointer=checkpointer,
+                    service_tier=service_tier
+                )
+                print("SUCCESS: Agent initialized")
+                print(f"Model: {model_name}")
+            except Exception as e:
+                print(f"ERROR: Error initializing agent: {e}")
+        # Yield to run app
+        yield
+        # Shutdown
+        print("Shutting down Single Agent API")
 
 
 # Initialize FastAPI app with lifespan
@@ -64,16 +101,22 @@ app.add_middleware(
 app.include_router(router)
 
 
-def run_cli(args):
+def run_cli(args, checkpointer=None):
     """Run in CLI mode"""
     # Initialize agent
     api_key = os.getenv("OPENAI_API_KEY")
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    service_tier = os.getenv("OPENAI_SERVICE_TIER") or None
     if not api_key:
         print("ERROR: OPENAI_API_KEY not found in .env file")
         sys.exit(1)
     
-    initialize_agent(api_key=api_key, model_name=model_name)
+    initialize_agent(
+        api_key=api_key,
+        model_name=model_name,
+        checkpointer=checkpointer,
+        service_tier=service_tier
+    )
     agent = get_agent()
     
     if args.start_session:
@@ -103,16 +146,13 @@ def run_cli(args):
         print(f"You: {args.message}")
         print("Agent: ", end="", flush=True)
         
-        # Get conversation history
-        conversation_history = session_service.get_conversation_history(session_id)
-        
         # Get user_id from session if available
         user_id = session.user_id if session else args.user_id
         
         # Process message (support memory via conversation_id)
+        # Prior turns are restored from the checkpointer by conversation_id
         result = agent.process_message(
             args.message,
-            conversation_history,
             user_id=user_id,
             conversation_id=session_id,
         )
@@ -127,7 +167,6 @@ def run_cli(args):
         # Print structured output if verbose
         if args.verbose:
             print("\nStructured Output:")
-            import json
             # Show key structured fields
             summary = {
                 "card_key": result.get("card_key"),
@@ -190,11 +229,15 @@ if __name__ == "__main__":
     # Determine mode
     if args.start_session or args.message:
         # CLI mode
-        run_cli(args)
+        with open_checkpointer() as checkpointer:
+            run_cli(args, checkpointer=checkpointer)
     else:
         # API mode (default)
         host = os.getenv("HOST", "0.0.0.0")
         port = int(os.getenv("PORT", 8000))
+        # Sessions live in process memory, so more than one worker also needs a
+        # shared checkpointer and sticky routing (or a shared session store)
+        workers = int(os.getenv("WORKERS", 1))
         
         print("Starting Single Agent API")
         print(f"Server: http://{host}:{port}")
@@ -202,10 +245,12 @@ if __name__ == "__main__":
         print(f"ReDoc: http://{host}:{port}/redoc")
         print()
         
-        # Run the server
+        # Run the server; uvicorn uses uvloop and httptools when installed
+        # (uvicorn[standard]), and needs an import string to spawn workers
         uvicorn.run(
-            app,
+            "main:app" if workers > 1 else app,
             host=host,
             port=port,
+            workers=workers,
             log_level="info"
         )
@@ -6,8 +6,6 @@ import logging
 from typing import Dict, Any, Optional
 from data import mock_store
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -19,9 +17,15 @@ class AccountService:
         try:
             logger.info("Initializing AccountService")
             self.store = mock_store
+            # Account data is immutable, so each success response is built once and
+            # returned by reference
+            self._found = {
+                account_id: {"success": True, "data": account}
+                for account_id, account in self.store.account_dicts.items()
+            }
             logger.info("AccountService initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing AccountService: {str(e)}", exc_info=True)
+            logger.error("Error initializing AccountService: %s", e, exc_info=True)
             raise
     
     def get_account_details(self, account_id: str) -> Dict[str, Any]:
@@ -34,28 +38,17 @@ class AccountService:
         Returns:
             Account details dictionary
         """
-        try:
-            logger.info(f"Fetching account details for: {account_id}")
-            account = self.store.get_account(account_id)
-            
-            if account:
-                logger.info(f"Account found: {account_id}")
-                return {
-                    "success": True,
-                    "data": account.dict()
-                }
-            else:
-                logger.warning(f"Account not found: {account_id}")
-                return {
-                    "success": False,
-                    "error": f"Account with ID '{account_id}' not found"
-                }
-                
-        except Exception as e:
-            logger.error(f"Error getting account details: {str(e)}", exc_info=True)
+        logger.info("Fetching account details for: %s", account_id)
+        response = self._found.get(account_id)
+        
+        if response is not None:
+            logger.info("Account found: %s", account_id)
+            return response
+        else:
+            logger.warning("Account not found: %s", account_id)
             return {
                 "success": False,
-                "error": f"Failed to get account details: {str(e)}"
+                "error": f"Account with ID '{account_id}' not found"
             }
     
     def get_all_accounts(self) -> Dict[str, Any]:
@@ -65,11 +58,10 @@ class AccountService:
         Returns:
             Dictionary with all accounts
         """
-        accounts = self.store.get_all_accounts()
         return {
             "success": True,
             "data": {
-                "account_overview": [acc.dict() for acc in accounts]
+                "account_overview": self.store.all_account_dicts
             }
         }
 
@@ -6,8 +6,6 @@ import logging
 from typing import Dict, Any, Optional
 from data import mock_store
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -19,9 +17,15 @@ class FacilityService:
         try:
             logger.info("Initializing FacilityService")
             self.store = mock_store
+            # Facility data is immutable, so each success response is built once and
+            # returned by reference
+            self._found = {
+                facility_id: {"success": True, "data": facility}
+                for facility_id, facility in self.store.facility_dicts.items()
+            }
             logger.info("FacilityService initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing FacilityService: {str(e)}", exc_info=True)
+            logger.error("Error initializing FacilityService: %s", e, exc_info=True)
             raise
     
     def get_facility_details(self, facility_id: str) -> Dict[str, Any]:
@@ -34,30 +38,37 @@ class FacilityService:
         Returns:
             Facility details dictionary
         """
-        try:
-            logger.info(f"Fetching facility details for: {facility_id}")
-            facility = self.store.get_facility(facility_id)
-            
-            if facility:
-                logger.info(f"Facility found: {facility_id}")
-                return {
-                    "success": True,
-                    "data": facility.dict()
-                }
-            else:
-                logger.warning(f"Facility not found: {facility_id}")
-                return {
-                    "success": False,
-                    "error": f"Facility with ID '{facility_id}' not found"
-                }
-                
-        except Exception as e:
-            logger.error(f"Error getting facility details: {str(e)}", exc_info=True)
+        logger.info("Fetching facility details for: %s", facility_id)
+        response = self._found.get(facility_id)
+        
+        if response is not None:
+            logger.info("Facility found: %s", facility_id)
+            return response
+        else:
+            logger.warning("Facility not found: %s", facility_id)
             return {
                 "success": False,
-                "error": f"Failed to get facility details: {str(e)}"
+                "error": f"Facility with ID '{facility_id}' not found"
             }
     
+    def get_facilities_by_account(self, account_id: str) -> Dict[str, Any]:
+        """
+        Get all facilities for an account
+        
+        Args:
+            account_id: Account identifier
+            
+        Returns:
+            Dictionary with the account's facilities
+        """
+        logger.info("Fetching facilities for account: %s", account_id)
+        return {
+            "success": True,
+            "data": {
+                "facility_overview": self.store.get_facility_dicts_by_account(account_id)
+            }
+        }
+    
     def get_all_facilities(self) -> Dict[str, Any]:
         """
         Get all facilities
@@ -65,11 +76,10 @@ class FacilityService:
         Returns:
             Dictionary with all facilities
         """
-        facilities = self.store.get_all_facilities()
         return {
             "success": True,
             "data": {
-                "facility_overview": [fac.dict() for fac in facilities]
+                "facility_overview": self.store.all_facility_dicts
             }
         }
 
@@ -3,14 +3,46 @@ Notes Service
 Business logic for notes operations
 """
 import logging
+import re
 from typing import Dict, Any, Optional, List
 from data import mock_store
+from data.models import Note
+from services.response_cache import response_cache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _note_to_dict(note: Note) -> Dict[str, Any]:
+    """
+    Convert a note to a JSON-ready dict
+    
+    Note has a small fixed shape, so a dict literal replaces asdict's generic
+    field walk. Timestamps are emitted as ISO strings, so tool output encodes
+    directly with json.dumps instead of falling back to the dict's repr.
+    """
+    return {
+        "note_id": note.note_id,
+        "user_id": note.user_id,
+        "content": note.content,
+        "created_at": note.created_at.isoformat(),
+        "updated_at": note.updated_at.isoformat()
+    }
+
+
+_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def _normalize_date(date: Optional[str]) -> Optional[str]:
+    """Normalize DD/MM/YYYY dates to YYYY-MM-DD; other values are returned as given"""
+    # ISO dates (no "/") skip the regex entirely
+    if date and "/" in date:
+        match = _DMY.fullmatch(date)
+        if match:
+            dd, mm, yyyy = match.groups()
+            return f"{yyyy}-{mm.zfill(2)}-{dd.zfill(2)}"
+    return date
+
+
 class NotesService:
     """Service for notes operations"""
     
@@ -21,7 +53,7 @@ class NotesService:
             self.store = mock_store
             logger.info("NotesService initialized successfully")
         except Exception as e:
-            logger.error(f"Error initializing NotesService: {str(e)}", exc_info=True)
+            logger.error("Error initializing NotesService: %s", e, exc_info=True)
             raise
     
     def save_note(self, account_id: str, content: str) -> Dict[str, Any]:
@@ -36,16 +68,18 @@ class NotesService:
             Saved note details
         """
         try:
-            logger.info(f"Saving note for account: {account_id}")
+            logger.info("Saving note for account: %s", account_id)
             note = self.store.save_note(account_id, content)
-            logger.info(f"Note saved successfully for account: {account_id}")
+            logger.info("Note saved successfully for account: %s", account_id)
+            # Cached agent responses (e.g. fetched notes) may now be stale
+            response_cache.clear()
             return {
                 "success": True,
-                "data": note.dict(),
+                "data": _note_to_dict(note),
                 "message": "Note saved successfully"
             }
         except Exception as e:
-            logger.error(f"Error saving note: {str(e)}", exc_info=True)
+            logger.error("Error saving note: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": f"Failed to save note: {str(e)}"
@@ -55,43 +89,51 @@ class NotesService:
         self,
         account_id: Optional[str] = None,
         date: Optional[str] = None,
-        last_n: int = 5,
-        order: str = "desc"
+        last_n: Optional[int] = 5,
+        order: str = "desc",
+        first_limit: Optional[int] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Fetch notes with optional filters
         
         Args:
             account_id: Optional account ID filter
-            date: Optional date filter (YYYY-MM-DD)
-            last_n: Number of recent notes to return
+            date: Optional date filter (YYYY-MM-DD or DD/MM/YYYY)
+            last_n: Number of most recent notes to return
+            order: "desc" (newest first) or "asc" (oldest first)
+            first_limit: Number of oldest notes to return (takes precedence over last_n)
+            from_date: Optional inclusive start date (YYYY-MM-DD or DD/MM/YYYY)
+            to_date: Optional inclusive end date (YYYY-MM-DD or DD/MM/YYYY)
             
         Returns:
             Dictionary with notes list
         """
         try:
-            logger.info(f"Fetching notes for account: {account_id}, date: {date}, last_n: {last_n}")
-            # Normalize date formats like DD/MM/YYYY to YYYY-MM-DD
-            if date and "/" in date:
-                try:
-                    dd, mm, yyyy = date.split("/")
-                    date = f"{yyyy}-{mm.zfill(2)}-{dd.zfill(2)}"
-                except Exception:
-                    pass
+            logger.info(
+                "Fetching notes for account: %s, date: %s, from: %s, to: %s, last_n: %s, first_limit: %s",
+                account_id, date, from_date, to_date, last_n, first_limit
+            )
             notes = self.store.get_notes(
                 account_id=account_id,
-                date=date,
+                date=_normalize_date(date),
                 last_n=last_n,
-                order=order
+                order=order,
+                first_limit=first_limit,
+                from_date=_normalize_date(from_date),
+                to_date=_normalize_date(to_date)
             )
-            logger.info(f"Fetched {len(notes)} notes")
+            data = [_note_to_dict(note) for note in notes]
+            count = len(data)
+            logger.info("Fetched %s notes", count)
             return {
                 "success": True,
-                "data": [note.dict() for note in notes],
-                "count": len(notes)
+                "data": data,
+                "count": count
             }
         except Exception as e:
-            logger.error(f"Error fetching notes: {str(e)}", exc_info=True)
+            logger.error("Error fetching notes: %s", e, exc_info=True)
             return {
                 "success": False,
                 "error": f"Failed to fetch notes: {str(e)}"
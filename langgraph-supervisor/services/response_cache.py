@@ -0,0 +1,175 @@
+"""
+Response Cache
+Short-lived cache of agent responses for repeated chat requests
+"""
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Mapping, Optional, Sequence
+
+# Tools whose effects must happen on every request, so their responses are never cached
+_SIDE_EFFECT_TOOLS = frozenset({"save_note"})
+
+# Number of trailing history messages that make up the conversation context in the key
+_HISTORY_TAIL = 4
+
+
+class _TTLCache:
+    """LRU cache whose entries expire after a fixed time-to-live"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize: Maximum number of entries (least recently used are evicted first)
+            ttl: Seconds an entry stays valid after it is set
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Cleared from note-saving tools, which run on executor threads
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss or an expired entry
+            
+        Returns:
+            Cached value if present and not expired, default otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries when full
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """TTL cache of successful agent responses keyed by request context"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """
+        Initialize the response cache
+        
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Seconds a response stays valid (0 disables caching)
+        """
+        self.configure(maxsize=maxsize, ttl=ttl)
+    
+    def configure(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        """
+        Reconfigure the cache, dropping any cached responses
+        
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Seconds a response stays valid (0 disables caching)
+        """
+        self.enabled = ttl > 0
+        self._cache = _TTLCache(maxsize=maxsize, ttl=ttl)
+    
+    @staticmethod
+    def make_key(
+        conversation_history: Sequence[Mapping[str, str]],
+        text: str,
+        account_id: Optional[str] = None,
+        facility_id: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> bytes:
+        """
+        Build the cache key for a chat request
+        
+        Args:
+            conversation_history: Session history before this message
+            text: User message
+            account_id: Optional account ID
+            facility_id: Optional facility ID
+            user_id: Optional user ID
+            
+        Returns:
+            Digest of the recent history, message and IDs
+        """
+        payload = json.dumps(
+            [conversation_history[-_HISTORY_TAIL:], text, account_id, facility_id, user_id],
+            separators=(",", ":")
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached response
+        
+        Args:
+            key: Key from make_key
+            
+        Returns:
+            Cached response if present and not expired, None otherwise
+        """
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+    
+    def set(self, key: bytes, response: Dict[str, Any]) -> None:
+        """
+        Cache a response if it is safe to replay
+        
+        Failed responses and responses that ran a side-effecting tool are not
+        cached, since replaying them would skip the side effect. Invalidation
+        after a write is done by the write itself (see NotesService.save_note),
+        so it happens whichever endpoint ran the tool.
+        
+        Args:
+            key: Key from make_key
+            response: Agent response dictionary
+        """
+        if not self.enabled or not response.get("success"):
+            return
+        
+        if any(call.get("tool") in _SIDE_EFFECT_TOOLS for call in response.get("tool_calls") or ()):
+            return
+        
+        self._cache.set(key, response)
+    
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        self._cache.clear()
+
+
+# Global instance, disabled until RESPONSE_CACHE_TTL enables it at application startup
+response_cache = ResponseCache(ttl=0)
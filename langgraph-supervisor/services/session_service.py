@@ -2,7 +2,8 @@
 Session Service
 Manages conversation sessions and history
 """
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Mapping, Optional, Any, Sequence
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 import uuid
 
@@ -12,9 +13,30 @@ from data.models import Session, Message
 class SessionService:
     """Service for managing conversation sessions"""
     
-    def __init__(self):
-        """Initialize session storage"""
-        self.sessions: Dict[str, Session] = {}
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize session storage
+        
+        Args:
+            max_sessions: Maximum number of sessions kept; the least recently
+                used (read or updated) are evicted first (0 disables the limit)
+            on_evict: Optional callback run with the ID of each evicted session,
+                e.g. to drop its checkpointed agent state
+        """
+        self.max_sessions = max_sessions
+        self.on_evict = on_evict
+        # Kept in order of last update (oldest first), so listing never has to sort
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # user_id -> that user's sessions in the same order, so user-filtered
+        # listing doesn't scan every session
+        self.sessions_by_user: Dict[Optional[str], "OrderedDict[str, Session]"] = defaultdict(OrderedDict)
+        # Session IDs in order of last access (oldest first), so eviction never
+        # picks a session a request has just read, e.g. one with a turn in progress
+        self._recency: "OrderedDict[str, None]" = OrderedDict()
     
     def create_session(self, user_id: Optional[str] = None) -> Session:
         """
@@ -26,15 +48,26 @@ class SessionService:
         Returns:
             Created session
         """
+        now = datetime.utcnow()
         session = Session(
-            session_id=str(uuid.uuid4()),
+            session_id=uuid.uuid4().hex,
             user_id=user_id,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=now,
+            updated_at=now,
             messages=[]
         )
         
         self.sessions[session.session_id] = session
+        self.sessions_by_user[user_id][session.session_id] = session
+        self._recency[session.session_id] = None
+        
+        # Evict the least recently used sessions to bound memory
+        if self.max_sessions > 0:
+            while len(self.sessions) > self.max_sessions:
+                evicted_id = next(iter(self._recency))
+                self.delete_session(evicted_id)
+                if self.on_evict is not None:
+                    self.on_evict(evicted_id)
         return session
     
     def get_session(self, session_id: str) -> Optional[Session]:
@@ -47,13 +80,17 @@ class SessionService:
         Returns:
             Session if found, None otherwise
         """
-        return self.sessions.get(session_id)
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self._recency.move_to_end(session_id)
+        return session
     
     def add_message(
         self,
         session_id: str,
         role: str,
-        content: str
+        content: str,
+        timestamp: Optional[datetime] = None
     ) -> bool:
         """
         Add message to session
@@ -62,6 +99,8 @@ class SessionService:
             session_id: Session identifier
             role: Message role ('user' or 'assistant')
             content: Message content
+            timestamp: Optional message time (defaults to now), so a user/assistant
+                pair can share one clock read
             
         Returns:
             Success status
@@ -73,31 +112,57 @@ class SessionService:
         message = Message(
             role=role,
             content=content,
-            timestamp=datetime.utcnow()
+            timestamp=timestamp or datetime.utcnow()
         )
         
         session.messages.append(message)
-        session.updated_at = datetime.utcnow()
+        # A user/assistant pair shares one timestamp, so it is formatted once per turn
+        if message.timestamp != session.updated_at:
+            session.updated_at = message.timestamp
+            session.updated_at_iso = message.timestamp.isoformat()
+        # Most recently updated sessions live at the end of both indexes
+        self.sessions.move_to_end(session_id)
+        self.sessions_by_user[session.user_id].move_to_end(session_id)
+        self._recency.move_to_end(session_id)
         return True
     
-    def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
+    def get_conversation_history(
+        self,
+        session_id: str,
+        include_metadata: bool = False
+    ) -> Sequence[Mapping[str, str]]:
         """
         Get conversation history in LangGraph format
         
+        Views are only built when first read and are then extended with just
+        the messages added since, so each message is converted at most once
+        per view.
+        
         Args:
             session_id: Session identifier
+            include_metadata: Include each message's ISO timestamp
             
         Returns:
-            List of messages
+            The session's own history view, not a copy: callers must not mutate
+            the list or its message dicts (copy it first if changes are needed)
         """
         session = self.sessions.get(session_id)
         if not session:
             return []
         
-        return [
-            {"role": msg.role, "content": msg.content}
-            for msg in session.messages
-        ]
+        if include_metadata:
+            history = session.history_with_metadata
+            for msg in session.messages[len(history):]:
+                history.append({
+                    "role": msg.role,
+                    "content": msg.content,
+                    "timestamp": msg.timestamp.isoformat()
+                })
+        else:
+            history = session.history
+            for msg in session.messages[len(history):]:
+                history.append({"role": msg.role, "content": msg.content})
+        return history
     
     def delete_session(self, session_id: str) -> bool:
         """
@@ -109,10 +174,17 @@ class SessionService:
         Returns:
             Success status
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        
+        self._recency.pop(session_id, None)
+        user_sessions = self.sessions_by_user.get(session.user_id)
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                del self.sessions_by_user[session.user_id]
+        return True
     
     def list_sessions(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -124,19 +196,22 @@ class SessionService:
         Returns:
             List of session summaries
         """
-        sessions = []
-        for session in self.sessions.values():
-            if user_id is None or session.user_id == user_id:
-                sessions.append({
-                    "session_id": session.session_id,
-                    "user_id": session.user_id,
-                    "created_at": session.created_at.isoformat(),
-                    "updated_at": session.updated_at.isoformat(),
-                    "message_count": len(session.messages)
-                })
+        if user_id is None:
+            sessions = self.sessions
+        else:
+            sessions = self.sessions_by_user.get(user_id, {})
         
-        sessions.sort(key=lambda x: x["updated_at"], reverse=True)
-        return sessions
+        # Both indexes are ordered by last update, so newest first is a reverse walk
+        return [
+            {
+                "session_id": session.session_id,
+                "user_id": session.user_id,
+                "created_at": session.created_at_iso,
+                "updated_at": session.updated_at_iso,
+                "message_count": len(session.messages)
+            }
+            for session in reversed(sessions.values())
+        ]
 
 
 # Global instance
@@ -46,11 +46,8 @@ async def test_complete_system():
         print(f"\n💬 User: {user_message}")
         print("🤖 Agent: ", end="", flush=True)
         
-        conversation_history = session_service.get_conversation_history(session_id)
-        
-        result = agent.process_message(
+        result = await agent.aprocess_message(
             user_message=user_message,
-            conversation_history=conversation_history,
             account_id="A-011977763",
             conversation_id=session_id
         )
@@ -73,11 +70,8 @@ async def test_complete_system():
         print(f"\n💬 User: {follow_up}")
         print("🤖 Agent: ", end="", flush=True)
         
-        conversation_history = session_service.get_conversation_history(session_id)
-        
-        result = agent.process_message(
+        result = await agent.aprocess_message(
             user_message=follow_up,
-            conversation_history=conversation_history,
             account_id="A-011977763",
             conversation_id=session_id
         )
@@ -93,11 +87,8 @@ async def test_complete_system():
         print(f"\n💬 User: {facility_query}")
         print("🤖 Agent: ", end="", flush=True)
         
-        conversation_history = session_service.get_conversation_history(session_id)
-        
-        result = agent.process_message(
+        result = await agent.aprocess_message(
             user_message=facility_query,
-            conversation_history=conversation_history,
             facility_id="F-015766066",
             conversation_id=session_id
         )
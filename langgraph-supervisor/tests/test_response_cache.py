@@ -0,0 +1,130 @@
+"""
+Response Cache Tests
+Cache-hit path of POST /chat and the checkpoint update it relies on
+Run from langgraph-supervisor/: python -m unittest discover tests
+"""
+import unittest
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent import single_agent
+from agent.single_agent import SingleAgent
+from api import router
+from services import session_service
+from services.response_cache import response_cache
+
+
+def _agent_result(final_response: str) -> dict:
+    """Build a successful agent result in the flat response format"""
+    return {
+        "final_response": final_response,
+        "card_key": "other",
+        "account_overview": None,
+        "rewards_overview": None,
+        "facility_overview": None,
+        "order_overview": None,
+        "note_overview": [],
+        "tool_calls": [],
+        "success": True
+    }
+
+
+class RecordTurnTest(unittest.IsolatedAsyncioTestCase):
+    """SingleAgent.arecord_turn writes a served turn into the checkpointed thread"""
+    
+    async def test_turn_is_appended_to_thread(self):
+        # No model call is made, so a placeholder key is enough to build the graph
+        agent = SingleAgent(api_key="sk-test")
+        config = {"configurable": {"thread_id": "record-turn-test"}}
+        
+        await agent.arecord_turn("record-turn-test", "show my notes", "Here are your notes.")
+        await agent.arecord_turn("record-turn-test", "thanks", "You're welcome!")
+        
+        state = await agent.agent.aget_state(config)
+        # Recorded as the model's reply, so no node is left pending for the next turn
+        self.assertEqual(state.next, ())
+        messages = state.values["messages"]
+        self.assertEqual(
+            [(type(m), m.content) for m in messages],
+            [
+                (HumanMessage, "show my notes"),
+                (AIMessage, "Here are your notes."),
+                (HumanMessage, "thanks"),
+                (AIMessage, "You're welcome!")
+            ]
+        )
+        
+        await agent.adelete_conversation("record-turn-test")
+
+
+class ChatCacheTest(unittest.IsolatedAsyncioTestCase):
+    """POST /chat serves repeated requests from the response cache"""
+    
+    async def asyncSetUp(self):
+        app = FastAPI()
+        app.include_router(router)
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+        
+        self.agent = mock.Mock()
+        self.agent.aprocess_message = mock.AsyncMock(return_value=_agent_result("Cached answer"))
+        self.agent.arecord_turn = mock.AsyncMock()
+        patcher = mock.patch.object(single_agent, "get_agent", return_value=self.agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.session_ids = []
+        self.addCleanup(self._cleanup)
+    
+    def _cleanup(self):
+        response_cache.configure(ttl=0)
+        for session_id in self.session_ids:
+            session_service.delete_session(session_id)
+    
+    async def _chat(self, text: str) -> dict:
+        """Send a message in a new session and return the response body"""
+        session = session_service.create_session(user_id="cache-test")
+        self.session_ids.append(session.session_id)
+        response = await self.client.post("/chat", json={
+            "text": text,
+            "user_id": "cache-test",
+            "account_id": "A-011977763",
+            "conversation_id": session.session_id
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    async def test_cache_hit_records_turn_instead_of_running_agent(self):
+        response_cache.configure(ttl=60)
+        
+        first = await self._chat("show account overview")
+        second = await self._chat("show account overview")
+        
+        # Both sessions start empty, so the second request has the same key
+        self.agent.aprocess_message.assert_awaited_once()
+        self.agent.arecord_turn.assert_awaited_once_with(
+            second["conversation_id"], "show account overview", "Cached answer"
+        )
+        self.assertEqual(second["final_response"], first["final_response"])
+        self.assertEqual(
+            [m["content"] for m in session_service.get_conversation_history(second["conversation_id"])],
+            ["show account overview", "Cached answer"]
+        )
+    
+    async def test_disabled_cache_skips_history_and_always_runs_agent(self):
+        response_cache.configure(ttl=0)
+        
+        with mock.patch.object(session_service, "get_conversation_history") as get_history:
+            await self._chat("show account overview")
+            await self._chat("show account overview")
+        
+        get_history.assert_not_called()
+        self.assertEqual(self.agent.aprocess_message.await_count, 2)
+        self.agent.arecord_turn.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()